@@ -8,28 +8,57 @@
 
 from __future__ import annotations
 
+import hashlib
+import logging
+import os
 import threading
 import time
 from pathlib import Path
 from datetime import datetime
-from typing import Callable, Optional, Dict, Any, List, Tuple
+from typing import TYPE_CHECKING, Callable, Optional, Dict, Any, List, Tuple
 
-import pandas as pd
+from snapshot_io import atomic_write_json, dumps_json, read_json
+from sap_api import fetch_jobs_rfc, shutdown_batch_pool
+from sap_connector import close_quietly, connect_sso
 
-from snapshot_io import atomic_write_json, read_json, write_json
-from sap_api import fetch_jobs_rfc
-from sap_connector import connect_sso
+if TYPE_CHECKING:
+    import pandas as pd
 
+# pandas/numpy are imported lazily inside the catalog helpers so that merely
+# importing this module (tray startup) does not pay the pandas import cost.
+
+log = logging.getLogger(__name__)
 
 DATA_DIR = Path("data")
 JOBS_XLSX = DATA_DIR / "jobs.xlsx"
 TRACK_STATE = DATA_DIR / "track_state.json"
 SNAPSHOT = DATA_DIR / "job_snapshot.json"
+CATALOG_CACHE_DIR = DATA_DIR / ".cache"
+# bump when _read_job_catalog_xlsx normalization changes, so old pickles are not reused
+CATALOG_CACHE_VERSION = 1
 
+# rewrite an unchanged snapshot at least this often (keeps generated_at fresh)
+SNAPSHOT_HEARTBEAT_SEC = 5 * 60
 
-def load_job_catalog() -> pd.DataFrame:
-    """Load the Excel catalog. This is the long-lived 'what jobs exist' list."""
-    df = pd.read_excel(JOBS_XLSX, sheet_name="jobs")
+# force an RFC reconnect if no call has succeeded for this long
+RFC_STALE_AFTER_SEC = 15 * 60
+
+# local tzinfo per DST state, so generated_at doesn't re-resolve the zone every poll
+_local_tz_by_dst: Dict[int, Any] = {}
+
+# in-process memo: (mtime_ns, size) of jobs.xlsx -> normalized catalog
+_catalog_memo: Dict[Tuple[int, int], pd.DataFrame] = {}
+
+
+def _read_job_catalog_xlsx() -> pd.DataFrame:
+    """Parse + normalize the Excel catalog (the slow path)."""
+    import pandas as pd
+
+    try:
+        # calamine (Rust) parses xlsx much faster than openpyxl
+        df = pd.read_excel(JOBS_XLSX, sheet_name="jobs", engine="calamine")
+    except ImportError:
+        df = pd.read_excel(JOBS_XLSX, sheet_name="jobs", engine="openpyxl")
     df.columns = [c.strip().lower() for c in df.columns]
 
     for col in ["job_name", "job_user", "group"]:
@@ -55,13 +84,52 @@ def load_job_catalog() -> pd.DataFrame:
     return df
 
 
+def load_job_catalog() -> pd.DataFrame:
+    """
+    Load the Excel catalog. This is the long-lived 'what jobs exist' list.
+
+    Parsing xlsx is expensive, so the normalized frame is cached by the
+    file's (mtime_ns, size): in memory for the current process and as a
+    pickle under data/.cache/ across restarts. An unchanged catalog costs
+    a single stat() per call.
+    """
+    import pandas as pd
+
+    st = JOBS_XLSX.stat()
+    key = (st.st_mtime_ns, st.st_size)
+
+    df = _catalog_memo.get(key)
+    if df is not None:
+        return df
+
+    cache_file = CATALOG_CACHE_DIR / f"jobs_v{CATALOG_CACHE_VERSION}_{key[0]}_{key[1]}.pkl"
+    try:
+        df = pd.read_pickle(cache_file)
+    except Exception:
+        df = _read_job_catalog_xlsx()
+        try:
+            CATALOG_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_suffix(".pkl.tmp")
+            df.to_pickle(tmp)
+            os.replace(tmp, cache_file)
+            for old in CATALOG_CACHE_DIR.glob("jobs_*.pkl"):
+                if old != cache_file:
+                    old.unlink(missing_ok=True)
+        except OSError:
+            pass  # cache is best-effort; the parsed frame is still good
+
+    _catalog_memo.clear()
+    _catalog_memo[key] = df
+    return df
+
+
 def load_track_state() -> Dict[str, bool]:
     """UI/runtime 'what jobs are tracked right now' state."""
     return read_json(TRACK_STATE, default={})
 
 
 def save_track_state(state: Dict[str, bool]) -> None:
-    write_json(TRACK_STATE, state)
+    atomic_write_json(TRACK_STATE, state, durable=True)
 
 
 def compute_tracked_jobs(df: pd.DataFrame, track_state: Dict[str, bool]) -> List[Tuple[str, str, int]]:
@@ -71,14 +139,55 @@ def compute_tracked_jobs(df: pd.DataFrame, track_state: Dict[str, bool]) -> List
       - enabled in catalog (Excel)
       - enabled in runtime state (track_state.json)
     """
-    tracked: List[Tuple[str, str, int]] = []
-    for _, r in df.iterrows():
-        name = r["job_name"]
-        enabled_catalog = bool(r["enabled"])
-        enabled_ui = bool(track_state.get(name, True))
-        if enabled_catalog and enabled_ui:
-            tracked.append((name, r.get("job_user", ""), int(r.get("expected_duration_sec", 0))))
-    return tracked
+    import numpy as np
+
+    names = df["job_name"].to_numpy()
+    users = df["job_user"].to_numpy()
+    expected = df["expected_duration_sec"].to_numpy(dtype=np.int64)
+    enabled_catalog = df["enabled"].to_numpy(dtype=bool)
+    enabled_ui = np.fromiter(
+        (bool(track_state.get(n, True)) for n in names), dtype=bool, count=len(names)
+    )
+
+    mask = enabled_catalog & enabled_ui
+    return list(zip(names[mask].tolist(), users[mask].tolist(), expected[mask].tolist()))
+
+
+def _connect_smp() -> Any:
+    return connect_sso(system="SMP", client="100", sysnr="00")
+
+
+def _drop_connections(conn: Any) -> None:
+    """
+    Close the main RFC connection and the batch workers' connections together,
+    so a reconnect recycles all of them.
+    """
+    if conn is not None:
+        close_quietly(conn)
+    shutdown_batch_pool()
+
+
+def _local_now() -> datetime:
+    isdst = time.localtime().tm_isdst
+    tz = _local_tz_by_dst.get(isdst)
+    if tz is None:
+        tz = _local_tz_by_dst[isdst] = datetime.now().astimezone().tzinfo
+    return datetime.now(tz)
+
+
+def _encode_snapshot(meta: Dict[str, Any], jobs: List[Dict[str, Any]]) -> Tuple[bytes, bytes]:
+    """
+    Serialize a snapshot once and return (digest, payload_bytes).
+
+    The digest covers jobs and meta minus generated_at (which changes on
+    every poll); the jobs bytes are shared between the hash and the file.
+    """
+    jobs_bytes = dumps_json(jobs, indent=False, sort_keys=True)
+    stable_meta = {k: v for k, v in meta.items() if k != "generated_at"}
+    h = hashlib.blake2b(dumps_json(stable_meta, indent=False, sort_keys=True), digest_size=16)
+    h.update(jobs_bytes)
+    payload = b'{"meta":' + dumps_json(meta, indent=False) + b',"jobs":' + jobs_bytes + b"}"
+    return h.digest(), payload
 
 
 class AgentController:
@@ -88,16 +197,27 @@ class AgentController:
         self.poll_interval_sec = poll_interval_sec
         self.stop_flag = threading.Event()
         self.pause_flag = threading.Event()
+        # inverse of pause_flag, so a paused loop can block instead of polling
+        self._resume_event = threading.Event()
+        self._resume_event.set()
         self.thread: Optional[threading.Thread] = None
 
+        # track_state.json is only re-parsed when its mtime changes
+        self._ts_mtime = -1
+        self._ts_cache: Dict[str, bool] = {}
+
+        self._last_snapshot_digest: Optional[bytes] = None
+        self._last_snapshot_write = 0.0
+        self._last_rfc_ok = 0.0
+
     def start(self, sap_conn_factory: Optional[Callable[[], Any]] = None) -> None:
         """Start (or resume) the agent."""
         if self.thread and self.thread.is_alive():
-            self.pause_flag.clear()
+            self.resume()
             return
 
         self.stop_flag.clear()
-        self.pause_flag.clear()
+        self.resume()
         self.thread = threading.Thread(
             target=self._run_loop,
             args=(sap_conn_factory,),
@@ -107,13 +227,26 @@ class AgentController:
 
     def pause(self) -> None:
         self.pause_flag.set()
+        self._resume_event.clear()
 
     def resume(self) -> None:
         self.pause_flag.clear()
+        self._resume_event.set()
 
     def stop(self) -> None:
         self.stop_flag.set()
-        self.pause_flag.clear()
+        self.resume()
+
+    def _current_track_state(self) -> Dict[str, bool]:
+        """Return track_state, re-reading the file only when it changed on disk."""
+        try:
+            mtime = TRACK_STATE.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = 0
+        if mtime != self._ts_mtime:
+            self._ts_cache = load_track_state()
+            self._ts_mtime = mtime
+        return self._ts_cache
 
     def _run_loop(self, sap_conn_factory: Optional[Callable[[], Any]]) -> None:
         DATA_DIR.mkdir(exist_ok=True)
@@ -124,7 +257,7 @@ class AgentController:
 
         while not self.stop_flag.is_set():
             if self.pause_flag.is_set():
-                time.sleep(0.25)
+                self._resume_event.wait()
                 continue
 
             # reload catalog every 60s (Excel edits get picked up without restart)
@@ -132,35 +265,51 @@ class AgentController:
                 df = load_job_catalog()
                 last_catalog_load = time.time()
 
-            track_state = load_track_state()
+            track_state = self._current_track_state()
             tracked_jobs = compute_tracked_jobs(df, track_state)
 
             # Connect if/when we switch to RFC
             # if sap_conn_factory and conn is None:
             #     conn = sap_conn_factory()
 
-            # MOCK for now:
-            if conn is None:
-                conn = connect_sso(system="SMP", client="100", sysnr="00")
-            jobs = fetch_jobs_rfc(conn, tracked_jobs)
-
-            snapshot = {
-                "meta": {
-                    "system": "SMP",
-                    "client": "100",
-                    "generated_at": datetime.now().astimezone().isoformat(),
-                    "poll_interval_sec": self.poll_interval_sec,
-                    "tracked_job_count": len(tracked_jobs),
-                },
-                "jobs": jobs
+            # pyrfc connections can go stale silently (firewall idle timeouts),
+            # so reconnect proactively after a long stretch without a good call
+            if conn is not None and (time.time() - self._last_rfc_ok) > RFC_STALE_AFTER_SEC:
+                _drop_connections(conn)
+                conn = None
+
+            try:
+                if conn is None:
+                    conn = _connect_smp()
+                jobs = fetch_jobs_rfc(conn, tracked_jobs, conn_factory=_connect_smp)
+                self._last_rfc_ok = time.time()
+            except Exception:
+                log.warning("⚠️ RFC poll failed; reconnecting next cycle", exc_info=True)
+                _drop_connections(conn)
+                conn = None
+                if self.stop_flag.wait(self.poll_interval_sec):
+                    break
+                continue
+
+            meta = {
+                "system": "SMP",
+                "client": "100",
+                "generated_at": _local_now().isoformat(timespec="seconds"),
+                "poll_interval_sec": self.poll_interval_sec,
+                "tracked_job_count": len(tracked_jobs),
             }
 
-            atomic_write_json(SNAPSHOT, snapshot)
-            time.sleep(self.poll_interval_sec)
+            # skip the write when nothing but the timestamp changed, but still
+            # rewrite periodically so the dashboard can tell the agent is alive
+            digest, payload = _encode_snapshot(meta, jobs)
+            now = time.time()
+            if (digest != self._last_snapshot_digest
+                    or (now - self._last_snapshot_write) >= SNAPSHOT_HEARTBEAT_SEC):
+                atomic_write_json(SNAPSHOT, payload_bytes=payload, durable=False)
+                self._last_snapshot_digest = digest
+                self._last_snapshot_write = now
+            if self.stop_flag.wait(self.poll_interval_sec):
+                break
 
         # cleanup
-        try:
-            if conn is not None:
-                conn.close()
-        except Exception:
-            pass
+        _drop_connections(conn)
@@ -9,7 +9,9 @@
 
 from __future__ import annotations
 
+import functools
 import webbrowser
+from pathlib import Path
 from typing import Callable, Optional
 
 import pystray
@@ -18,6 +20,7 @@ from PIL import Image, ImageDraw
 from agent import AgentController
 
 DASHBOARD_URL = "http://localhost:5006/dashboard"
+TRAY_ICON_PNG = Path(__file__).resolve().parent / "assets" / "tray.png"
 
 
 def set_dashboard_url(url: str) -> None:
@@ -25,7 +28,16 @@ def set_dashboard_url(url: str) -> None:
     DASHBOARD_URL = url
 
 
+@functools.lru_cache(maxsize=1)
 def _make_icon() -> Image.Image:
+    """Tray icon: pre-rendered assets/tray.png if present, otherwise drawn once."""
+    if TRAY_ICON_PNG.exists():
+        try:
+            with Image.open(TRAY_ICON_PNG) as png:
+                return png.convert("RGBA")
+        except OSError:
+            pass
+
     img = Image.new("RGBA", (64, 64), (0, 0, 0, 0))
     d = ImageDraw.Draw(img)
     d.rounded_rectangle((6, 6, 58, 58), radius=12, outline=(255, 255, 255, 255), width=3)
@@ -11,6 +11,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Dict, Any, List
 
+import numpy as np
 from bokeh.io import curdoc
 from bokeh.layouts import column, row
 from bokeh.models import (
@@ -18,7 +19,7 @@ from bokeh.models import (
     CheckboxEditor, StringFormatter, NumberFormatter, Div, Button, CDSView, BooleanFilter
 )
 
-from snapshot_io import read_json, write_json
+from snapshot_io import atomic_write_json, read_json
 
 
 DATA_DIR = Path("data")
@@ -31,7 +32,7 @@ def load_track_state() -> Dict[str, bool]:
 
 
 def save_track_state(state: Dict[str, bool]) -> None:
-    write_json(TRACK_STATE, state)
+    atomic_write_json(TRACK_STATE, state, durable=True)
 
 
 def load_snapshot() -> Dict[str, Any]:
@@ -39,42 +40,59 @@ def load_snapshot() -> Dict[str, Any]:
 
 
 def jobs_to_columns(jobs: List[Dict[str, Any]], track_state: Dict[str, bool]) -> Dict[str, list]:
-    cols = {
-        "tracked": [],
-        "job_name": [],
-        "job_user": [],
-        "status": [],
-        "next_run": [],
-        "last_start": [],
-        "last_end": [],
-        "runtime_sec": [],
-        "expected_duration_sec": [],
-        "late_by_sec": [],
-        "current_step": [],
-        "current_step_runtime_sec": [],
-        "last_message": [],
-        "steps_json": [],
+    n = len(jobs)
+    tracked_col = [False] * n
+    name_col = [""] * n
+    user_col = [""] * n
+    status_col = [""] * n
+    next_run_col = [""] * n
+    last_start_col = [""] * n
+    last_end_col = [""] * n
+    runtime_col = [None] * n
+    expected_col = [0] * n
+    late_by_col = [0] * n
+    step_col = [""] * n
+    step_runtime_col = [None] * n
+
+    ts_get = track_state.get
+    for i, j in enumerate(jobs):
+        jg = j.get
+        name = str(jg("job_name", "")).strip()
+        tracked_col[i] = bool(ts_get(name, True))
+        name_col[i] = name
+        user_col[i] = jg("job_user", "")
+        status_col[i] = jg("status", "")
+        next_run_col[i] = jg("next_run", "")
+        last_start_col[i] = jg("last_start", "") or ""
+        last_end_col[i] = jg("last_end", "") or ""
+        runtime_col[i] = jg("runtime_sec", None)
+        expected_col[i] = jg("expected_duration_sec", 0)
+        late_by_col[i] = jg("late_by_sec", 0)
+        step_col[i] = jg("current_step", "")
+        step_runtime_col[i] = jg("current_step_runtime_sec", None)
+
+    return {
+        "tracked": tracked_col,
+        "job_name": name_col,
+        "job_user": user_col,
+        "status": status_col,
+        "next_run": next_run_col,
+        "last_start": last_start_col,
+        "last_end": last_end_col,
+        "runtime_sec": runtime_col,
+        "expected_duration_sec": expected_col,
+        "late_by_sec": late_by_col,
+        "current_step": step_col,
+        "current_step_runtime_sec": step_runtime_col,
     }
 
-    for j in jobs:
-        name = str(j.get("job_name", "")).strip()
-        tracked = bool(track_state.get(name, True))
-        cols["tracked"].append(tracked)
-        cols["job_name"].append(name)
-        cols["job_user"].append(j.get("job_user", ""))
-        cols["status"].append(j.get("status", ""))
-        cols["next_run"].append(j.get("next_run", ""))
-        cols["last_start"].append(j.get("last_start", "") or "")
-        cols["last_end"].append(j.get("last_end", "") or "")
-        cols["runtime_sec"].append(j.get("runtime_sec", None))
-        cols["expected_duration_sec"].append(j.get("expected_duration_sec", 0))
-        cols["late_by_sec"].append(j.get("late_by_sec", 0))
-        cols["current_step"].append(j.get("current_step", ""))
-        cols["current_step_runtime_sec"].append(j.get("current_step_runtime_sec", None))
-        cols["last_message"].append(j.get("last_message", ""))
-        cols["steps_json"].append(j.get("steps", []))
-
-    return cols
+
+def jobs_to_details(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Row-aligned side table for the details pane (kept out of the CDS transport)."""
+    return [
+        {"last_message": j.get("last_message", ""), "steps": j.get("steps", []) or []}
+        for j in jobs
+    ]
 
 
 # --- UI widgets
@@ -96,34 +114,75 @@ details = Div(text="<b>Job details</b><br>Select a row to see steps.", width=520
 snapshot = load_snapshot()
 track_state = load_track_state()
 source = ColumnDataSource(jobs_to_columns(snapshot.get("jobs", []), track_state))
+row_details = jobs_to_details(snapshot.get("jobs", []))
 
-view = CDSView(filter=BooleanFilter([True] * len(source.data.get("job_name", []))))
+# one filter object for the session; apply_filters only updates .booleans
+bool_filter = BooleanFilter(booleans=[True] * len(source.data.get("job_name", [])))
+view = CDSView(filter=bool_filter)
 show_tracked_only = {"enabled": False}
 
 
+# filter inputs derived from source.data; cleared before source rows change
+# and rebuilt lazily by the next apply_filters call
+_filter_arrays: Dict[str, Any] = {}
+
+
+def _rebuild_filter_arrays():
+    _filter_arrays["names_lower"] = np.char.lower(
+        np.asarray(source.data.get("job_name", []), dtype=str)
+    )
+    _filter_arrays["status"] = np.asarray(source.data.get("status", []), dtype=str)
+
+
 def apply_filters():
     q = (search.value or "").strip().lower()
-    statuses = set(status_filter.value or [])
+    statuses = list(status_filter.value or [])
+
+    # the mask must match the current row count, or the browser-side view breaks
+    n_rows = len(source.data.get("job_name", []))
+    if not _filter_arrays or len(_filter_arrays["names_lower"]) != n_rows:
+        _rebuild_filter_arrays()
+    names_lower = _filter_arrays["names_lower"]
+
+    mask = np.ones(len(names_lower), dtype=bool)
+    if q:
+        mask &= np.char.find(names_lower, q) >= 0
+    if statuses:
+        mask &= np.isin(_filter_arrays["status"], statuses)
+    if show_tracked_only["enabled"]:
+        mask &= np.asarray(source.data.get("tracked", []), dtype=bool)
+
+    bool_filter.booleans = mask.tolist()
+
+
+def _mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
 
-    tracked_mask = [bool(x) for x in source.data.get("tracked", [])]
-    names = [str(x).lower() for x in source.data.get("job_name", [])]
-    st = [str(x) for x in source.data.get("status", [])]
+def _diff_columns(old: Dict[str, list], new: Dict[str, list]) -> Dict[str, list]:
+    """Per-column [(row, value), ...] patches for cells that differ between old and new."""
+    patches: Dict[str, list] = {}
+    for col, new_vals in new.items():
+        old_vals = old.get(col, [])
+        changed = [(i, v) for i, (o, v) in enumerate(zip(old_vals, new_vals)) if o != v]
+        if changed:
+            patches[col] = changed
+    return patches
 
-    mask = []
-    for i in range(len(names)):
-        ok = True
-        if q and q not in names[i]:
-            ok = False
-        if statuses and st[i] not in statuses:
-            ok = False
-        if show_tracked_only["enabled"] and not tracked_mask[i]:
-            ok = False
-        mask.append(ok)
 
-    view.filter = BooleanFilter(mask)
+# (snapshot mtime, track_state mtime) at the last refresh
+_last_refresh_mtimes = {"value": None}
 
 
 def refresh_from_snapshot():
+    mtimes = (_mtime_ns(SNAPSHOT), _mtime_ns(TRACK_STATE))
+    if mtimes == _last_refresh_mtimes["value"]:
+        return
+    _last_refresh_mtimes["value"] = mtimes
+
     snap = load_snapshot()
     meta = snap.get("meta", {})
     jobs = snap.get("jobs", [])
@@ -137,8 +196,24 @@ def refresh_from_snapshot():
         f"<b>Tracked (agent):</b> {count}"
     )
 
-    state = load_track_state()
-    source.data = jobs_to_columns(jobs, state)
+    # lay not-yet-flushed Track edits over the file so a refresh can't revert them
+    disk_state = load_track_state()
+    pending = _track_flush["pending"]
+    if pending is None:
+        _track_flush["persisted"] = dict(disk_state)
+    state = {**disk_state, **(pending or {})}
+    row_details[:] = jobs_to_details(jobs)
+    cols = jobs_to_columns(jobs, state)
+    if cols["job_name"] == list(source.data.get("job_name", [])):
+        # same rows in the same order: send only changed cells (keeps selection)
+        patches = _diff_columns(source.data, cols)
+        if patches:
+            # the change callback re-runs apply_filters; it must not see old rows
+            _filter_arrays.clear()
+            source.patch(patches)
+    else:
+        _filter_arrays.clear()
+        source.data = cols
     apply_filters()
 
 
@@ -169,16 +244,37 @@ table = DataTable(
 )
 
 
+# Track checkbox edits are coalesced and flushed to disk once per burst
+# "persisted" mirrors what is on disk, so rewriting identical state is skipped
+_track_flush = {"pending": None, "scheduled": False, "persisted": dict(track_state)}
+
+
+def _flush_track_state():
+    _track_flush["scheduled"] = False
+    state = _track_flush["pending"]
+    _track_flush["pending"] = None
+    if state is None or state == _track_flush["persisted"]:
+        return
+    try:
+        save_track_state(state)
+        _track_flush["persisted"] = state
+    except Exception:
+        pass
+
+
 def on_source_data_change(attr, old, new):
-    """Persist Track checkbox edits into track_state.json."""
+    """Persist Track checkbox edits into track_state.json (debounced)."""
     try:
         names = source.data.get("job_name", [])
         tracked = source.data.get("tracked", [])
-        state = load_track_state()
+        state = _track_flush["pending"] or dict(load_track_state())
         for n, t in zip(names, tracked):
             if n:
                 state[str(n)] = bool(t)
-        save_track_state(state)
+        _track_flush["pending"] = state
+        if not _track_flush["scheduled"]:
+            _track_flush["scheduled"] = True
+            curdoc().add_timeout_callback(_flush_track_state, 500)
         apply_filters()
     except Exception:
         pass
@@ -198,8 +294,9 @@ def on_selection_change(attr, old, new):
     last_start = source.data["last_start"][i]
     runtime = source.data["runtime_sec"][i]
     current_step = source.data["current_step"][i]
-    msg = source.data["last_message"][i]
-    steps = source.data["steps_json"][i] or []
+    detail = row_details[i] if i < len(row_details) else {}
+    msg = detail.get("last_message", "")
+    steps = detail.get("steps", [])
 
     steps_html = "<ul>"
     for s in steps:
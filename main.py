@@ -8,6 +8,7 @@
 
 from __future__ import annotations
 
+import logging
 import threading
 import webbrowser
 from pathlib import Path
@@ -17,6 +18,7 @@ from bokeh.application import Application
 from bokeh.application.handlers.script import ScriptHandler
 
 import app_tray
+import sap_connector
 
 APP_DIR = Path(__file__).resolve().parent
 DASHBOARD_SCRIPT = str(APP_DIR / "dashboard.py")
@@ -38,6 +40,8 @@ def _start_bokeh_server() -> Server:
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    sap_connector.warmup()
     server = _start_bokeh_server()
 
     app_tray.set_dashboard_url("http://localhost:5006/dashboard")
@@ -9,25 +9,39 @@
 
 from __future__ import annotations
 
-from typing import List, Dict, Any, Tuple
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Any, Optional, Tuple
+
+from sap_connector import close_quietly
 
 TrackedJob = Tuple[str, str, int]
 
 
-def fetch_jobs_rfc(conn, tracked_jobs: List[TrackedJob]) -> List[Dict[str, Any]]:
+def _dt_str(d, t):
+    """SAP DATS/TIMS (YYYYMMDD / HHMMSS) -> ISO string. SAP sends digits or blanks."""
+    d = (d or "").strip()
+    if len(d) != 8:
+        return None
+    t = (t or "").strip()
+    if len(t) >= 6:
+        return f"{d[:4]}-{d[4:6]}-{d[6:8]}T{t[:2]}:{t[2:4]}:{t[4:6]}"
+    return f"{d[:4]}-{d[4:6]}-{d[6:8]}"
 
-    it_filter = []
-    expected_map = {}
 
-    for job_name, job_user, expected in tracked_jobs:
-        expected_map[job_name] = expected
-        it_filter.append({
-            "JOBNAME": job_name,
-            "SDLUNAME": job_user or "",
-            "JOBCOUNT": "",
-            "CLIENT": ""
-        })
+# Large filters are split into batches and fanned out over worker threads,
+# each with its own RFC connection (a pyrfc Connection is not thread-safe).
+BATCH_SIZE = 50
+MAX_WORKERS = 4
+
+_worker_local = threading.local()
+_worker_conns: List[Any] = []
+_pool_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
 
+
+def _call_export(conn, it_filter: List[Dict[str, str]]) -> Tuple[list, list]:
     resp = conn.call(
         "ZSRE_JOBMON_EXPORT",
         IT_FILTER=it_filter,
@@ -36,19 +50,97 @@ def fetch_jobs_rfc(conn, tracked_jobs: List[TrackedJob]) -> List[Dict[str, Any]]
         IV_INCLUDE_STEPS="X",
         IV_MAX_JOBS=200
     )
+    return resp.get("ET_JOBS", []) or [], resp.get("ET_STEPS", []) or []
+
+
+def _call_export_worker(conn_factory: Callable[[], Any], it_filter: List[Dict[str, str]]) -> Tuple[list, list]:
+    """Run one batch on this worker thread's own connection (created on first use)."""
+    conn = getattr(_worker_local, "conn", None)
+    if conn is None:
+        conn = conn_factory()
+        _worker_local.conn = conn
+        with _pool_lock:
+            _worker_conns.append(conn)
+    try:
+        return _call_export(conn, it_filter)
+    except Exception:
+        # drop the broken connection; the next batch on this thread reconnects
+        _worker_local.conn = None
+        with _pool_lock:
+            if conn in _worker_conns:
+                _worker_conns.remove(conn)
+        close_quietly(conn)
+        raise
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _pool_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="rfc-batch")
+        return _executor
+
+
+def shutdown_batch_pool() -> None:
+    """Stop the batch workers and close their RFC connections."""
+    global _executor
+    with _pool_lock:
+        executor, _executor = _executor, None
+        conns = list(_worker_conns)
+        _worker_conns.clear()
+    if executor is not None:
+        executor.shutdown(wait=True)
+    for conn in conns:
+        close_quietly(conn)
+
+
+def fetch_jobs_rfc(
+    conn,
+    tracked_jobs: List[TrackedJob],
+    conn_factory: Optional[Callable[[], Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Call ZSRE_JOBMON_EXPORT for the tracked jobs and map the result to snapshot rows.
+
+    If conn_factory is given and there are more than BATCH_SIZE tracked jobs,
+    the filter is split into batches: the first runs on conn, the rest run
+    concurrently on worker connections created via conn_factory.
+    """
+    it_filter = []
+    expected_map = {}
 
-    et_jobs = resp.get("ET_JOBS", []) or []
-    et_steps = resp.get("ET_STEPS", []) or []
+    for job_name, job_user, expected in tracked_jobs:
+        expected_map[job_name] = expected
+        it_filter.append({
+            "JOBNAME": job_name,
+            "SDLUNAME": job_user or "",
+            "JOBCOUNT": "",
+            "CLIENT": ""
+        })
 
-    steps_by_key: Dict[tuple, List[Dict[str, Any]]] = {}
+    if conn_factory is None or len(it_filter) <= BATCH_SIZE:
+        et_jobs, et_steps = _call_export(conn, it_filter)
+    else:
+        batches = [it_filter[i:i + BATCH_SIZE] for i in range(0, len(it_filter), BATCH_SIZE)]
+        executor = _get_executor()
+        futures = [executor.submit(_call_export_worker, conn_factory, b) for b in batches[1:]]
+        et_jobs, et_steps = _call_export(conn, batches[0])
+        et_jobs, et_steps = list(et_jobs), list(et_steps)
+        for f in futures:
+            jobs_part, steps_part = f.result()
+            et_jobs.extend(jobs_part)
+            et_steps.extend(steps_part)
+
+    steps_by_key: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
     for s in et_steps:
-        key = (s.get("JOBNAME", ""), s.get("JOBCOUNT", ""))
-        steps_by_key.setdefault(key, []).append({
-            "step_no": int(s.get("STEPCNT") or 0),
-            "type": s.get("STEP_TYPE", "") or "ABAP",
-            "name": s.get("PROGNAME", "") or "",
-            "variant": s.get("VARIANT", "") or "",
-            "status": s.get("STEP_STATUS", "") or "UNKNOWN",
+        sg = s.get
+        stepcnt = sg("STEPCNT")
+        steps_by_key[(sg("JOBNAME", ""), sg("JOBCOUNT", ""))].append({
+            "step_no": int(stepcnt) if stepcnt else 0,
+            "type": sg("STEP_TYPE", "") or "ABAP",
+            "name": sg("PROGNAME", "") or "",
+            "variant": sg("VARIANT", "") or "",
+            "status": sg("STEP_STATUS", "") or "UNKNOWN",
         })
 
     out: List[Dict[str, Any]] = []
@@ -69,19 +161,8 @@ def fetch_jobs_rfc(conn, tracked_jobs: List[TrackedJob]) -> List[Dict[str, Any]]
         if expected and runtime_sec and runtime_sec > expected:
             late_by = runtime_sec - expected
 
-        def dt_str(d, t):
-            d = (d or "").strip()
-            t = (t or "").strip()
-            if len(d) == 8 and d.isdigit():
-                yyyy, mm, dd = d[0:4], d[4:6], d[6:8]
-                if t and len(t) >= 6 and t.isdigit():
-                    hh, mi, ss = t[0:2], t[2:4], t[4:6]
-                    return f"{yyyy}-{mm}-{dd}T{hh}:{mi}:{ss}"
-                return f"{yyyy}-{mm}-{dd}"
-            return None
-
-        last_start = dt_str(j.get("STRTDATE"), j.get("STRTTIME"))
-        last_end = dt_str(j.get("ENDDATE"), j.get("ENDTIME"))
+        last_start = _dt_str(j.get("STRTDATE"), j.get("STRTTIME"))
+        last_end = _dt_str(j.get("ENDDATE"), j.get("ENDTIME"))
 
         key = (job_name, jobcount)
         steps = steps_by_key.get(key, [])
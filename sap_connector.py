@@ -15,25 +15,73 @@
 from __future__ import annotations
 
 import os
-import getpass
-import configparser
-from typing import Tuple, List, Optional
+import re
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import TYPE_CHECKING, Dict, Tuple, Optional
 
-from pyrfc import Connection, CommunicationError, LogonError
+# configparser / getpass / ctypes are imported where used, so importing
+# this module stays cheap for callers that never open a connection.
+if TYPE_CHECKING:
+    import configparser
 
 
 # ---------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------
 
+log = logging.getLogger(__name__)
+
 HERE = os.path.abspath(os.path.dirname(__file__))
 CONFIG_PATH = os.path.join(HERE, "sap_sso_config.ini")
 
+# pyrfc loads the NW RFC SDK native libraries on import; defer that until a
+# connection is actually requested. Holds (Connection, CommunicationError, LogonError).
+_PYRFC = None
+_PYRFC_LOCK = threading.Lock()
+
+# Known SNC failure signatures in CommunicationError text, matched in one scan
+_SNC_RETRY_RE = re.compile(
+    r"(?P<init>SNCERR_INIT|SncPDLInit)"
+    r"|(?P<handshake>Actual server name differs|SncPEstablishContext)"
+)
+_SNC_RETRY_MESSAGES = {
+    "init": "⚠️ SNC init failed for this sapcrypto.dll; trying next candidate...",
+    "handshake": "⚠️ SNC handshake warning; trying next candidate...",
+}
+
+# system -> (application host, SNC partnername)
+_SYSTEMS: Dict[str, Tuple[str, str]] = {
+    "SMP": ("vartsmpapp1", "p/sapsso:CN=SMP"),
+    "SMD": ("vartsmdpas", "p/sapsso:CN=SMD"),
+}
+
+# parsed sap_sso_config.ini keyed by path -> (mtime_ns, parser)
+_CFG_CACHE: Dict[str, Tuple[int, configparser.ConfigParser]] = {}
+
+# sapcrypto.dll that last produced a working connection; tried first next time
+_LAST_GOOD_LIB: Optional[str] = None
+
 
 # ---------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------
 
+def _pyrfc():
+    """
+    Import pyrfc on first use and cache the classes we need.
+    """
+    global _PYRFC
+    if _PYRFC is None:
+        with _PYRFC_LOCK:
+            if _PYRFC is None:
+                from pyrfc import Connection, CommunicationError, LogonError
+                _PYRFC = (Connection, CommunicationError, LogonError)
+    return _PYRFC
+
+
 def _detect_user_snc() -> Tuple[str, str]:
     """
     Determine SNC myname for the current user.
@@ -41,71 +89,165 @@ def _detect_user_snc() -> Tuple[str, str]:
     Keep this aligned with your SLC/SNC setup. If your environment
     requires a fully-qualified SNC subject, update this format.
     """
+    import getpass
+
     user = getpass.getuser()
     user_id = user
     snc_myname = f"p:CN={user}"
     return snc_myname, user_id
 
 
-def _candidate_crypto_libs() -> List[str]:
+# Prioritized candidate sapcrypto.dll paths.
+# We prefer 64-bit Program Files first, then fall back.
+_CANDIDATES: Tuple[str, ...] = (
+    # 64-bit (preferred)
+    r"C:\Program Files\SAP\FrontEnd\SecureLogin\lib\sapcrypto.dll",
+    r"C:\Program Files\SAP\FrontEnd\SecureLoginClient\lib\sapcrypto.dll",
+
+    # Sometimes installed under SAP GUI/NW RFC SDK locations (varies)
+    r"C:\Program Files\SAP\NW RFC SDK\lib\sapcrypto.dll",
+
+    # 32-bit (last resort; only works if you are truly running 32-bit Python/PyRFC)
+    r"C:\Program Files (x86)\SAP\FrontEnd\SecureLogin\lib\sapcrypto.dll",
+    r"C:\Program Files (x86)\SAP\FrontEnd\SecureLoginClient\lib\sapcrypto.dll",
+)
+
+
+def _candidate_crypto_libs() -> Tuple[str, ...]:
     """
     Return a prioritized list of candidate sapcrypto.dll paths.
-    We prefer 64-bit Program Files first, then fall back.
     """
-    candidates = [
-        # 64-bit (preferred)
-        r"C:\Program Files\SAP\FrontEnd\SecureLogin\lib\sapcrypto.dll",
-        r"C:\Program Files\SAP\FrontEnd\SecureLoginClient\lib\sapcrypto.dll",
-        r"C:\Program Files\SAP\FrontEnd\SecureLoginClient\lib\sapcrypto.dll",
-        r"C:\Program Files\SAP\FrontEnd\SecureLogin\lib\sapcrypto.dll",
+    return _CANDIDATES
+
 
-        # Sometimes installed under SAP GUI/NW RFC SDK locations (varies)
-        r"C:\Program Files\SAP\NW RFC SDK\lib\sapcrypto.dll",
-        r"C:\Program Files\SAP\NW RFC SDK\lib\sapcrypto.dll",
+@functools.lru_cache(maxsize=1)
+def _find_crypto_libs_existing() -> Tuple[str, ...]:
+    """
+    Filter candidates to only those that exist on disk.
+    Cached for the life of the process; see clear_crypto_lib_cache().
+    """
+    candidates = _candidate_crypto_libs()
 
-        # 32-bit (last resort; only works if you are truly running 32-bit Python/PyRFC)
-        r"C:\Program Files (x86)\SAP\FrontEnd\SecureLogin\lib\sapcrypto.dll",
-        r"C:\Program Files (x86)\SAP\FrontEnd\SecureLoginClient\lib\sapcrypto.dll",
-    ]
+    # One scandir per lib directory instead of one stat per candidate; a
+    # missing directory (no SLC / RFC SDK installed) costs a single failed call.
+    entries_by_dir: Dict[str, set] = {}
+    for d in dict.fromkeys(os.path.dirname(p) for p in candidates):
+        try:
+            with os.scandir(d) as it:
+                entries_by_dir[d] = {e.name.lower() for e in it if e.is_file()}
+        except OSError:
+            continue
 
-    # De-dupe while keeping order
-    seen = set()
-    out = []
-    for p in candidates:
-        if p not in seen:
-            seen.add(p)
-            out.append(p)
-    return out
+    return tuple(
+        p for p in candidates
+        if os.path.basename(p).lower() in entries_by_dir.get(os.path.dirname(p), ())
+    )
 
 
-def _find_crypto_libs_existing() -> List[str]:
+def clear_crypto_lib_cache() -> None:
     """
-    Filter candidates to only those that exist on disk.
+    Forget the detected sapcrypto.dll list (e.g. after installing SLC, or in tests).
     """
-    libs = [p for p in _candidate_crypto_libs() if os.path.exists(p)]
-    return libs
+    _find_crypto_libs_existing.cache_clear()
 
 
-def _ensure_config(default_partner: str) -> str:
+def _read_config() -> configparser.ConfigParser:
     """
-    Ensure sap_sso_config.ini exists and contains the desired SNC partnername.
-    Returns the configured partnername.
+    Parse sap_sso_config.ini, reusing the previous parse while its mtime is unchanged.
     """
+    import configparser
+
+    try:
+        mtime = os.stat(CONFIG_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return configparser.ConfigParser()
+
+    cached = _CFG_CACHE.get(CONFIG_PATH)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
     cfg = configparser.ConfigParser()
-    if os.path.exists(CONFIG_PATH):
-        cfg.read(CONFIG_PATH)
+    cfg.read(CONFIG_PATH)
+    _CFG_CACHE[CONFIG_PATH] = (mtime, cfg)
+    return cfg
+
+
+def _ensure_config(default_partner: str, snc_lib: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Ensure sap_sso_config.ini exists and contains the desired SNC partnername
+    (and, when given, the last sapcrypto.dll that connected successfully).
+    Returns (partnername, snc_lib) as configured; snc_lib is "" if never stored.
+    """
+    cfg = _read_config()
 
     if "SAP" not in cfg:
         cfg["SAP"] = {}
 
+    changed = False
     current = (cfg["SAP"].get("snc_partnername") or "").strip()
     if current != default_partner:
         cfg["SAP"]["snc_partnername"] = default_partner
+        changed = True
+        log.info("✅ Set SNC partner in %s to '%s'", CONFIG_PATH, default_partner)
+
+    stored_lib = (cfg["SAP"].get("snc_lib") or "").strip()
+    if snc_lib and stored_lib != snc_lib:
+        cfg["SAP"]["snc_lib"] = snc_lib
+        stored_lib = snc_lib
+        changed = True
+
+    if changed:
+        _CFG_CACHE.pop(CONFIG_PATH, None)
         with open(CONFIG_PATH, "w") as f:
             cfg.write(f)
-        print(f"✅ Set SNC partner in {CONFIG_PATH} to '{default_partner}'")
+        _CFG_CACHE[CONFIG_PATH] = (os.stat(CONFIG_PATH).st_mtime_ns, cfg)
+
+    # both values are known at this point; no need to read them back
+    return default_partner, stored_lib
+
+
+def close_quietly(conn) -> None:
+    """
+    Close an RFC connection, ignoring errors (it may already be dead).
+    """
+    try:
+        conn.close()
+    except Exception:
+        pass
+
 
-    return cfg["SAP"]["snc_partnername"].strip()
+def _close_probe_result(fut) -> None:
+    if not fut.cancelled() and fut.exception() is None:
+        close_quietly(fut.result())
+
+
+def _report_connect_failure(e: Exception) -> None:
+    """
+    Log why a candidate sapcrypto.dll did not produce a connection.
+    """
+    _, CommunicationError, LogonError = _pyrfc()
+
+    if isinstance(e, CommunicationError):
+        m = _SNC_RETRY_RE.search(str(e))
+        log.warning(_SNC_RETRY_MESSAGES[m.lastgroup] if m else "⚠️ RFC CommunicationError; trying next candidate...")
+    elif isinstance(e, LogonError):
+        log.warning("⚠️ SAP LogonError; trying next candidate...")
+    else:
+        log.warning("⚠️ Unexpected error; trying next candidate...")
+
+
+def _remember_good_lib(partner: str, snc_lib: str) -> None:
+    """
+    Record the working sapcrypto.dll in memory and in the ini (best-effort).
+    """
+    global _LAST_GOOD_LIB
+    if _LAST_GOOD_LIB == snc_lib:
+        return
+    _LAST_GOOD_LIB = snc_lib
+    try:
+        _ensure_config(partner, snc_lib=snc_lib)
+    except OSError:
+        pass
 
 
 def _system_to_host_partner(system: Optional[str], host: str) -> Tuple[str, str, str]:
@@ -117,15 +259,10 @@ def _system_to_host_partner(system: Optional[str], host: str) -> Tuple[str, str,
         # Infer from host
         system = "SMP" if "smp" in (host or "").lower() else "SMD"
     system = system.upper()
-
-    if system == "SMP":
-        host = "vartsmpapp1"
-        partner = "p/sapsso:CN=SMP"
-    else:
+    if system not in _SYSTEMS:
         system = "SMD"
-        host = "vartsmdpas"
-        partner = "p/sapsso:CN=SMD"
 
+    host, partner = _SYSTEMS[system]
     return system, host, partner
 
 
@@ -133,6 +270,38 @@ def _system_to_host_partner(system: Optional[str], host: str) -> Tuple[str, str,
 # Public connector
 # ---------------------------------------------------------------------
 
+def _prewarm_crypto() -> None:
+    """
+    Load each detected sapcrypto.dll once so the OS has it paged in
+    before the first SNC handshake. Failures are irrelevant here.
+    """
+    import ctypes
+
+    loader = getattr(ctypes, "WinDLL", ctypes.CDLL)
+    for lib in _find_crypto_libs_existing():
+        try:
+            loader(lib)
+        except OSError:
+            pass
+
+
+_WARMUP_STARTED = threading.Event()
+
+
+def warmup() -> None:
+    """
+    Start pre-loading the SSO crypto library in a daemon thread.
+
+    Call once during application startup so the DLL load overlaps with
+    other boot work. Not run at import time, to keep importing this module
+    cheap. Safe to call more than once.
+    """
+    if _WARMUP_STARTED.is_set():
+        return
+    _WARMUP_STARTED.set()
+    threading.Thread(target=_prewarm_crypto, name="sso-warmup", daemon=True).start()
+
+
 def connect_sso(
     host: str = "vartsmdpas",
     sysnr: str = "00",
@@ -149,14 +318,19 @@ def connect_sso(
           SMP -> vartsmpapp1 + p/sapsso:CN=SMP
       - Non-fatal first failure:
           If one sapcrypto.dll fails to initialize (SNCERR_INIT), try the next.
+      - The last working sapcrypto.dll is tried alone first; any remaining
+        candidates are probed concurrently and the highest-priority one
+        that succeeds is used (and remembered).
 
     Returns:
       pyrfc.Connection
     """
+    Connection = _pyrfc()[0]
+
     system, host, partner_default = _system_to_host_partner(system, host)
 
     # Keep ini aligned to selected system partner
-    snc_partner = _ensure_config(partner_default)
+    snc_partner, stored_lib = _ensure_config(partner_default)
 
     snc_myname, user_id = _detect_user_snc()
 
@@ -168,11 +342,8 @@ def connect_sso(
             "Install SAP Secure Login Client (64-bit preferred) or ensure sapcrypto.dll is present."
         )
 
-    last_error = None
-
-    # Try each crypto lib until one works
-    for snc_lib in crypto_libs:
-        params = dict(
+    def params_for(snc_lib: str) -> dict:
+        return dict(
             ashost=host,
             sysnr=sysnr,
             client=client,
@@ -184,40 +355,143 @@ def connect_sso(
             snc_myname=snc_myname,
         )
 
-        print(f"Connecting to SAP ({host}, system={system}) as {user_id} via SSO ...")
-        print(f"   Trying SNC library: {snc_lib}")
+    log.info("Connecting to SAP (%s, system=%s) as %s via SSO ...", host, system, user_id)
 
+    last_error = None
+    remaining = list(crypto_libs)
+
+    # The last known-good library (this process, else the ini) almost always
+    # works, so try it on its own before probing the others.
+    preferred = _LAST_GOOD_LIB or stored_lib
+    if preferred in remaining:
+        remaining.remove(preferred)
+        log.debug("   Trying SNC library: %s", preferred)
         try:
-            conn = Connection(**params)
-            print("SAP SSO connection established.")
+            conn = Connection(**params_for(preferred))
+            log.info("SAP SSO connection established.")
+            _remember_good_lib(partner_default, preferred)
             return conn
-
-        except CommunicationError as e:
+        except Exception as e:
             last_error = e
-            msg = str(e)
-
-            if "SNCERR_INIT" in msg or "SncPDLInit" in msg:
-                print("⚠️ SNC init failed for this sapcrypto.dll; trying next candidate...")
-                continue
-
-            if "Actual server name differs" in msg or "SncPEstablishContext" in msg:
-                print("⚠️ SNC handshake warning; trying next candidate...")
-                continue
-
-            print("⚠️ RFC CommunicationError; trying next candidate...")
-            continue
-
-        except LogonError as e:
-            last_error = e
-            print("⚠️ SAP LogonError; trying next candidate...")
-            continue
+            _report_connect_failure(e)
 
+    if len(remaining) == 1:
+        snc_lib = remaining[0]
+        log.debug("   Trying SNC library: %s", snc_lib)
+        try:
+            conn = Connection(**params_for(snc_lib))
+            log.info("SAP SSO connection established.")
+            _remember_good_lib(partner_default, snc_lib)
+            return conn
         except Exception as e:
             last_error = e
-            print("⚠️ Unexpected error; trying next candidate...")
-            continue
+            _report_connect_failure(e)
+
+    elif remaining:
+        # Probe the rest concurrently: wall time is the slowest SNC init,
+        # not the sum of them. The highest-priority candidate that succeeds
+        # wins, so we only stop once every higher-ranked attempt has finished;
+        # any other successful connections are closed.
+        log.debug("   Trying SNC libraries concurrently: %s", remaining)
+        rank = {lib: i for i, lib in enumerate(remaining)}
+        pool = ThreadPoolExecutor(max_workers=len(remaining), thread_name_prefix="snc-probe")
+        futures = {pool.submit(Connection, **params_for(lib)): lib for lib in remaining}
+        successes = {}
+        winner = None
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    e = f.exception()
+                    if e is not None:
+                        last_error = e
+                        _report_connect_failure(e)
+                    else:
+                        successes[futures[f]] = f.result()
+                if successes:
+                    best = min(successes, key=rank.__getitem__)
+                    if all(rank[futures[f]] > rank[best] for f in pending):
+                        break
+        finally:
+            if successes:
+                best = min(successes, key=rank.__getitem__)
+                winner = (best, successes.pop(best))
+            for extra in successes.values():
+                close_quietly(extra)
+            # lower-priority attempts still in flight are not needed; close them when they land
+            for f in pending:
+                f.cancel()
+                f.add_done_callback(_close_probe_result)
+            pool.shutdown(wait=False)
+
+        if winner is not None:
+            snc_lib, conn = winner
+            log.info("SAP SSO connection established.")
+            _remember_good_lib(partner_default, snc_lib)
+            return conn
 
     raise RuntimeError(
         "Unable to establish SAP SSO connection after trying all detected sapcrypto.dll candidates.\n"
         f"Last error: {last_error}"
     ) from last_error
+
+
+# ---------------------------------------------------------------------
+# Shared connection pool
+# ---------------------------------------------------------------------
+
+# (system, client, user) -> pyrfc.Connection
+_POOL: Dict[Tuple[str, str, str], object] = {}
+_POOL_LOCK = threading.Lock()
+
+
+def get_pooled_connection(
+    host: str = "vartsmdpas",
+    sysnr: str = "00",
+    client: str = "100",
+    system: Optional[str] = None,
+):
+    """
+    Return a shared SSO connection for (system, client, current user).
+
+    Each new connection costs a full SNC handshake and one of SAP's limited
+    RFC conversations, so callers should reuse this one instead of calling
+    connect_sso per task. A cached connection is health-checked with ping()
+    and rebuilt if it has gone stale.
+
+    The handle itself is not thread-safe: serialize calls made on it, or
+    use connect_sso for a dedicated per-thread connection.
+    """
+    import getpass
+
+    system, _, _ = _system_to_host_partner(system, host)
+    key = (system, client, getpass.getuser())
+
+    with _POOL_LOCK:
+        conn = _POOL.get(key)
+        if conn is not None:
+            try:
+                conn.ping()
+                return conn
+            except Exception:
+                # CommunicationError for a dropped link, RFCError/ExternalRuntimeError
+                # for a closed or invalidated handle: either way, rebuild it
+                log.warning("⚠️ Pooled SAP connection is stale; reconnecting...")
+                _POOL.pop(key, None)
+                close_quietly(conn)
+
+        conn = connect_sso(host=host, sysnr=sysnr, client=client, system=system)
+        _POOL[key] = conn
+        return conn
+
+
+def close_pool() -> None:
+    """
+    Close every pooled connection (call on shutdown).
+    """
+    with _POOL_LOCK:
+        conns = list(_POOL.values())
+        _POOL.clear()
+    for conn in conns:
+        close_quietly(conn)
@@ -9,29 +9,175 @@
 from __future__ import annotations
 
 import json
+import os
+import tempfile
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:  # stdlib json fallback
+    orjson = None
 
-def atomic_write_json(path: Path, payload: Dict[str, Any]) -> None:
-    """Write JSON atomically to avoid partial reads by the dashboard."""
+# both parsers accept bytes, so reads skip the str decode step
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def dumps_json(payload: Any, *, indent: bool = True, sort_keys: bool = False) -> bytes:
+    """
+    Serialize straight to bytes (single pass, no str -> UTF-8 re-encode).
+    indent=False emits compact JSON for files only machines read;
+    sort_keys=True gives a stable encoding suitable for hashing.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(payload, option=option)
+    # ensure_ascii output is pure ASCII, so the ascii codec is a plain copy
+    if indent:
+        return json.dumps(payload, indent=2, sort_keys=sort_keys, ensure_ascii=True).encode("ascii")
+    return json.dumps(
+        payload, separators=(",", ":"), sort_keys=sort_keys, ensure_ascii=True
+    ).encode("ascii")
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Best-effort fsync of a directory so a rename inside it is durable (POSIX only)."""
+    if os.name != "posix":
+        return
+    try:
+        dfd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dfd)
+    except OSError:
+        pass  # e.g. ENOTSUP/EINVAL on SMB/NFS mounts
+    finally:
+        os.close(dfd)
+
+
+def _write_replace(path: Path, data: bytes, durable: bool) -> None:
+    """
+    Write data to a temp file next to path (fsync if durable), then rename over path.
+
+    The temp name is unique per call, so concurrent writers never share a
+    staging file, and it is removed if anything fails before the rename.
+    """
     path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-    tmp.replace(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        try:
+            if hasattr(os, "fchmod"):
+                os.fchmod(fd, 0o644)  # mkstemp creates 0600
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            if durable:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(
+    path: Path,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    payload_bytes: Optional[bytes] = None,
+    durable: bool = True,
+    indent: bool = True,
+) -> None:
+    """
+    Write JSON atomically to avoid partial reads by the dashboard.
+
+    With durable=True (default) the temp file is fsynced before the rename
+    and the parent directory after it, so a crash can never leave an empty
+    or truncated file behind. durable=False skips both fsyncs: readers still
+    never see a half-written file, but the latest write may be lost on power
+    failure. That is fine for derived state like the job snapshot, which is
+    regenerated every poll.
+
+    indent=False writes compact JSON (cheaper to encode and parse) for
+    files nobody reads by hand.
+
+    payload_bytes, when given, is written verbatim instead of serializing
+    payload (for callers that already hold encoded JSON). It is not
+    validated: supplying well-formed JSON is the caller's responsibility.
+    Exactly one of payload / payload_bytes must be given (TypeError otherwise).
+    """
+    if (payload is None) == (payload_bytes is None):
+        raise TypeError("atomic_write_json() needs exactly one of payload or payload_bytes")
+    if payload_bytes is None:
+        payload_bytes = dumps_json(payload, indent=indent)
+    _write_replace(path, payload_bytes, durable)
+
+    if durable:
+        _fsync_dir(path.parent)
+
+
+def atomic_write_json_batch(
+    items: Iterable[Tuple[Path, Dict[str, Any]]], *, durable: bool = True, indent: bool = True
+) -> None:
+    """
+    Atomically write several JSON files, fsyncing each parent directory once.
+
+    Each file gets the same tmp+fsync+rename treatment as atomic_write_json,
+    but the directory barrier is paid per unique directory instead of per file.
+    """
+    dirs = set()
+    for path, payload in items:
+        _write_replace(path, dumps_json(payload, indent=indent), durable)
+        dirs.add(path.parent)
+
+    if durable:
+        for d in dirs:
+            _fsync_dir(d)
+
+
+# str(path) -> (mtime_ns, size, parsed value)
+_READ_CACHE: Dict[str, Tuple[int, int, Any]] = {}
 
 
 def read_json(path: Path, default: Any) -> Any:
-    """Read JSON safely. Returns default on missing file or parse error."""
+    """
+    Read JSON safely. Returns default on missing file or parse error.
+
+    The parsed value is cached on (mtime_ns, size), so polling an unchanged
+    file costs one stat(). Callers share the cached object and must not
+    mutate it (copy first).
+    """
     try:
-        if not path.exists():
-            return default
-        return json.loads(path.read_text(encoding="utf-8"))
+        st = path.stat()
+    except OSError:
+        return default
+
+    key = str(path)
+    cached = _READ_CACHE.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+
+    try:
+        value = _loads(path.read_bytes())
     except Exception:
         return default
+    _READ_CACHE[key] = (st.st_mtime_ns, st.st_size, value)
+    return value
+
+
+read_json.cache_clear = _READ_CACHE.clear
 
 
 def write_json(path: Path, payload: Any) -> None:
     """Write JSON (non-atomic is fine for small config files like track_state)."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    path.write_bytes(dumps_json(payload))